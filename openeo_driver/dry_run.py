@@ -37,7 +37,7 @@ from __future__ import annotations
 
 import logging
 from enum import Enum
-from typing import Any, List, Optional, Tuple, Union
+from typing import Any, Collection, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import numpy
 import shapely.geometry.base
@@ -99,16 +99,54 @@ source_constraint_blockers = {
 }
 
 
+# Operations (in order) to extract source constraints from
+_SOURCE_CONSTRAINT_OPS = (
+    "temporal_extent",
+    "spatial_extent",
+    "weak_spatial_extent",
+    "bands",
+    "aggregate_spatial",
+    "sar_backscatter",
+    "process_type",
+    "custom_cloud_mask",
+    "properties",
+    "filter_spatial",
+    "filter_labels",
+)
+# Bit flags of source constraint operations (see `DataTraceBase._op_mask`)
+_SOURCE_CONSTRAINT_OP_BITS = {op: 1 << i for i, op in enumerate(_SOURCE_CONSTRAINT_OPS)}
+
+
+# Resampling operations (whose parameters can be pushed down to the data source)
+_RESAMPLE_OPS = frozenset({"resample_cube_spatial", "resample_spatial"})
+# Operations that prevent pushing resampling parameters down to the data source.
+_RESAMPLE_BLOCKING_OPS = frozenset(
+    {
+        "apply_kernel",
+        "reduce_dimension",
+        "apply",
+        "apply_dimension",
+        "apply_neighborhood",
+        "reduce_dimension_binary",
+        "mask",
+        "to_scl_dilation_mask",
+    }
+)
+
+
 class DataTraceBase:
     """Base class for data traces."""
 
+    __slots__ = ["children"]
+
+    # Bit mask of source constraint operations that occur in the trace (none for a data source).
+    _op_mask = 0
+    # Whether this is a data source (root of a trace): class level flag, cheaper to check than `isinstance`.
+    _is_source = False
+
     def __init__(self):
         self.children = []
 
-    def __hash__(self):
-        # Identity hash (e.g. memory address)
-        return id(self)
-
     def get_source(self) -> "DataSource":
         raise NotImplementedError
 
@@ -123,7 +161,18 @@ class DataTraceBase:
         """
         return []
 
-    def get_operation_closest_to_source(self, operations: Union[str, List[str]]) -> Union["DataTraceBase", None]:
+    def collect_arguments(self, operations: Collection[str]) -> Dict[str, List[Union[dict, tuple]]]:
+        """
+        Collect arguments of multiple operations at once (in parent->child order),
+        like `get_arguments_by_operation`, but in a single walk over the trace.
+
+        :return: dictionary mapping each of the given operations to its list of arguments
+        """
+        return {op: [] for op in operations}
+
+    def get_operation_closest_to_source(
+        self, operations: Union[str, Collection[str]]
+    ) -> Union["DataTraceBase", None]:
         raise NotImplementedError
 
     def describe(self) -> str:
@@ -139,22 +188,30 @@ class DataTraceBase:
 class DataSource(DataTraceBase):
     """Data source: a data (cube) generating process like `load_collection`, `load_disk_data`, ..."""
 
-    __slots__ = ["_process", "_arguments"]
+    __slots__ = ["_process", "_arguments", "_source_id"]
+
+    _is_source = True
 
     def __init__(self, process: str = "load_collection", arguments: Union[dict, tuple] = ()):
         super().__init__()
         self._process = process
         self._arguments = arguments
+        self._source_id: Optional[tuple] = None
 
     def get_source(self) -> "DataSource":
         return self
 
     def get_source_id(self) -> tuple:
         """Identifier for source (hashable tuple, to be used as dict key for example)."""
-        return to_hashable((self._process, self._arguments))
-
-    def get_operation_closest_to_source(self, operations: Union[str, List[str]]) -> Union["DataTraceBase", None]:
-        if not isinstance(operations, list):
+        # Process and arguments are not modified after construction, so the id can be cached.
+        if self._source_id is None:
+            self._source_id = to_hashable((self._process, self._arguments))
+        return self._source_id
+
+    def get_operation_closest_to_source(
+        self, operations: Union[str, Collection[str]]
+    ) -> Union["DataTraceBase", None]:
+        if isinstance(operations, str):
             operations = [operations]
         if self._process in operations:
             return self
@@ -211,7 +268,7 @@ class DataTrace(DataTraceBase):
     traces (e.g. after mask or merge process).
     """
 
-    __slots__ = ["parent", "_operation", "_arguments"]
+    __slots__ = ["parent", "_operation", "_arguments", "_source", "_lineage", "_op_mask"]
 
     def __init__(self, parent: DataTraceBase, operation: str, arguments: Union[dict, tuple]):
         super().__init__()
@@ -219,26 +276,62 @@ class DataTrace(DataTraceBase):
         parent.add_child(self)
         self._operation = operation
         self._arguments = arguments
+        # Lazily resolved (and cached) data source at the root of this trace.
+        self._source: Optional[DataSource] = None
+        # Lazily built (and cached) flat tuple of all traces from source to this trace.
+        self._lineage: Optional[Tuple["DataTrace", ...]] = None
+        self._op_mask: int = parent._op_mask | _SOURCE_CONSTRAINT_OP_BITS.get(operation, 0)
 
     def get_source(self) -> DataSource:
-        return self.parent if isinstance(self.parent, DataSource) else self.parent.get_source()
+        # Note: parent is fixed at construction time, so the resolved source can be cached safely.
+        source = self._source
+        if source is None:
+            parent = self.parent
+            source = parent if parent._is_source else parent.get_source()
+            self._source = source
+        return source
+
+    def _get_lineage(self) -> Tuple["DataTrace", ...]:
+        """
+        Flattened version of the linked list of traces (in parent->child order, excluding the data source),
+        so that repeated lookups iterate over a tuple instead of chasing parent references.
+        """
+        lineage = self._lineage
+        if lineage is None:
+            traces = []
+            trace = self
+            while not trace._is_source:
+                traces.append(trace)
+                trace = trace.parent
+            traces.reverse()
+            lineage = self._lineage = tuple(traces)
+        return lineage
 
     def get_arguments_by_operation(self, operation: str) -> List[Union[dict, tuple]]:
         # Return in parent->child order
-        res = self.parent.get_arguments_by_operation(operation)
-        if self._operation == operation:
-            res.append(self._arguments)
+        return [t._arguments for t in self._get_lineage() if t._operation == operation]
+
+    def collect_arguments(self, operations: Collection[str]) -> Dict[str, List[Union[dict, tuple]]]:
+        res = {op: [] for op in operations}
+        for trace in self._get_lineage():
+            args = res.get(trace._operation)
+            if args is not None:
+                args.append(trace._arguments)
         return res
 
-    def get_operation_closest_to_source(self, operations: Union[str, List[str]]) -> Union["DataTraceBase", None]:
-        if not isinstance(operations, list):
+    def get_operation_closest_to_source(
+        self, operations: Union[str, Collection[str]]
+    ) -> Union["DataTraceBase", None]:
+        if isinstance(operations, str):
             operations = [operations]
-        # First look up in parent (because we want the one closest to source)
-        parent_op = self.parent.get_operation_closest_to_source(operations)
-        if parent_op:
-            return parent_op
-        elif self._operation in operations:
-            return self
+        lineage = self._get_lineage()
+        # First look up in source (because we want the one closest to source)
+        source_op = lineage[0].parent.get_operation_closest_to_source(operations)
+        if source_op:
+            return source_op
+        for trace in lineage:
+            if trace._operation in operations:
+                return trace
 
     def __repr__(self):
         return "<{c}#{i}(#{p}, {o}, {a})>".format(
@@ -249,9 +342,16 @@ class DataTrace(DataTraceBase):
         return self.parent.describe() + "<-" + self._operation
 
 
-# Type hint for source constaints
-# TODO make this a real class?
-SourceConstraint = Tuple[Tuple[str, tuple], dict]
+class SourceConstraint(NamedTuple):
+    """
+    Constraints for a data source, as extracted from a dry run.
+    Being a (named) tuple, it can still be unpacked as `(source_id, constraints)`.
+    """
+
+    # Source identifier, e.g. `("load_collection", ("Sentinel2", ...))`
+    source_id: Tuple[str, tuple]
+    # Dictionary with constraint fields like "temporal_extent", "spatial_extent", "bands", ...
+    constraints: dict
 
 
 class DryRunDataTracer:
@@ -272,7 +372,10 @@ class DryRunDataTracer:
 
     def process_traces(self, traces: List[DataTraceBase], operation: str, arguments: dict) -> List[DataTraceBase]:
         """Process given traces with an operation (and keep track of the results)."""
-        return [self.add_trace(DataTrace(parent=t, operation=operation, arguments=arguments)) for t in traces]
+        # Bulk version of `add_trace`
+        new_traces = [DataTrace(parent=t, operation=operation, arguments=arguments) for t in traces]
+        self._traces.extend(new_traces)
+        return new_traces
 
     def load_collection(
         self, collection_id: str, arguments: dict, metadata: dict = None, env: EvalEnv = EvalEnv()
@@ -365,18 +468,22 @@ class DryRunDataTracer:
         Get all nodes in the tree of traces that are not parent of another trace.
         In openEO this could be for instance a save_result process that ends the workflow.
         """
+        # Iterative depth-first search, in order of the tracked traces.
+        # Note: no caching, as trace trees can also grow outside of this tracer (`DataTrace(parent=...)`)
         leaves = []
-
-        def get_leaves(tree: DataTraceBase) -> List[DataTraceBase]:
-            return (
-                [tree] if len(tree.children) == 0 else [leaf for child in tree.children for leaf in get_leaves(child)]
-            )
-
+        visited = set()
         for trace in self._traces:
-            for leaf in get_leaves(trace):
-                if leaf not in leaves:
-                    leaves.append(leaf)
-
+            stack = [trace]
+            while stack:
+                tree = stack.pop()
+                if tree in visited:
+                    # All leaves under this tree were already collected
+                    continue
+                visited.add(tree)
+                if tree.children:
+                    stack.extend(reversed(tree.children))
+                else:
+                    leaves.append(tree)
         return leaves
 
     def get_metadata_links(self):
@@ -405,27 +512,15 @@ class DryRunDataTracer:
                     buffer_size = args[0]["buffer_size"]
                     constraints["pixel_buffer"] = {"buffer_size": buffer_size}
 
-            resampling_op = leaf.get_operation_closest_to_source(["resample_cube_spatial", "resample_spatial"])
+            resampling_op = leaf.get_operation_closest_to_source(_RESAMPLE_OPS)
             if resampling_op:
-                resample_valid = True
+                # Collect all relevant arguments in a single walk
+                resampling_args = resampling_op.collect_arguments(_RESAMPLE_OPS | _RESAMPLE_BLOCKING_OPS)
                 # the resampling parameters can be taken into account during load_collection,
                 # under the condition that no operations occur in between that may be affected
-                for op in [
-                    "apply_kernel",
-                    "reduce_dimension",
-                    "apply",
-                    "apply_dimension",
-                    "apply_neighborhood",
-                    "reduce_dimension_binary",
-                    "mask",
-                    "to_scl_dilation_mask",
-                ]:
-                    args = resampling_op.get_arguments_by_operation(op)
-                    if args:
-                        resample_valid = False
-                        break
+                resample_valid = not any(resampling_args[op] for op in _RESAMPLE_BLOCKING_OPS)
                 if resample_valid:
-                    args = resampling_op.get_arguments_by_operation("resample_cube_spatial")
+                    args = resampling_args["resample_cube_spatial"]
                     if args:
                         target = args[0]["target"]
                         method = args[0]["method"]
@@ -439,54 +534,43 @@ class DryRunDataTracer:
                                 "resolution": resolutions,
                                 "method": method,
                             }
-                    args = resampling_op.get_arguments_by_operation("resample_spatial")
+                    args = resampling_args["resample_spatial"]
                     if args:
                         resolution = normalize_resample_resolution(args[0]["resolution"])
                         projection = args[0]["projection"]
                         method = args[0].get("method", "near")
                         constraints["resample"] = {"target_crs": projection, "resolution": resolution, "method": method}
 
-            for op in [
-                "temporal_extent",
-                "spatial_extent",
-                "weak_spatial_extent",
-                "bands",
-                "aggregate_spatial",
-                "sar_backscatter",
-                "process_type",
-                "custom_cloud_mask",
-                "properties",
-                "filter_spatial",
-                "filter_labels",
-            ]:
+            # Only consider constraint operations that actually occur in the leaf's trace
+            op_mask = leaf._op_mask
+            constraint_ops = [op for op in _SOURCE_CONSTRAINT_OPS if op_mask & _SOURCE_CONSTRAINT_OP_BITS[op]]
+            # Collect arguments of all constraint operations in a single walk over the leaf's trace
+            leaf_args = leaf.collect_arguments(constraint_ops) if constraint_ops else {}
+            for op in constraint_ops:
+                args = leaf_args[op]
                 # 1 some processes can not be skipped when pushing filters down,
                 # so find the subgraph that no longer contains these blockers
-                leaf_without_blockers = leaf
-                if op in source_constraint_blockers:
-                    subgraph_without_blocking_processes = leaf.get_operation_closest_to_source(
-                        source_constraint_blockers[op]
-                    )
+                blockers = source_constraint_blockers.get(op)
+                if blockers:
+                    subgraph_without_blocking_processes = leaf.get_operation_closest_to_source(blockers)
                     if subgraph_without_blocking_processes is not None:
-                        leaf_without_blockers = subgraph_without_blocking_processes
+                        args = subgraph_without_blocking_processes.get_arguments_by_operation(op)
 
                 # 2 merge filtering arguments
-                if leaf_without_blockers is not None:
-                    args = leaf_without_blockers.get_arguments_by_operation(op)
-                    if args:
-                        if merge:
-                            # Take first item (to reproduce original behavior)
-                            # TODO: take temporal/spatial/categorical intersection instead?
-                            #       see https://github.com/Open-EO/openeo-processes/issues/201
-                            constraints[op] = args[0]
-                        else:
-                            constraints[op] = args
+                if args:
+                    if merge:
+                        # Take first item (to reproduce original behavior)
+                        # TODO: take temporal/spatial/categorical intersection instead?
+                        #       see https://github.com/Open-EO/openeo-processes/issues/201
+                        constraints[op] = args[0]
+                    else:
+                        constraints[op] = args
 
             if "weak_spatial_extent" in constraints:
-                if "spatial_extent" not in constraints:
-                    constraints["spatial_extent"] = constraints["weak_spatial_extent"]
+                constraints.setdefault("spatial_extent", constraints["weak_spatial_extent"])
 
             source_id = leaf.get_source().get_source_id()
-            source_constraints.append((source_id, constraints))
+            source_constraints.append(SourceConstraint(source_id=source_id, constraints=constraints))
         return source_constraints
 
     def get_geometries(
@@ -913,6 +997,8 @@ class DryRunDataCube(DriverDataCube):
 
     # TODO: some methods need metadata manipulation?
 
+    # Note: these explicit class level aliases are necessary: a `__getattr__` based fallback would not work,
+    # as most of these methods are already defined (as "not implemented") in `DriverDataCube`.
     apply_tiles = _nop
 
     reduce = _nop
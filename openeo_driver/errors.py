@@ -25,12 +25,14 @@ where necessary or useful.
 
 """
 
-import json
+import functools
 import re
+import sys
 import textwrap
-from typing import List, Set, Optional
+import types
+from typing import Dict, FrozenSet, List, Mapping, Optional, Type
 
-from openeo_driver.specs import SPECS_ROOT
+from openeo_driver.specs import read_spec
 from openeo_driver.util.logging import FlaskRequestCorrelationIdLogging
 
 
@@ -55,6 +57,14 @@ class OpenEOApiException(Exception):
     _tags = ["General"]
     url = None
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "code" in cls.__dict__:
+            # Error codes are compared and used as dict keys a lot: intern them.
+            cls.code = sys.intern(cls.code)
+        # First registration wins, so subclasses that just inherit `code` don't hijack it.
+        EXCEPTIONS_BY_CODE.setdefault(cls.code, cls)
+
     def __init__(
             self,
             message: Optional[str] = None,
@@ -64,26 +74,53 @@ class OpenEOApiException(Exception):
             url: Optional[str] = None,
     ):
         super().__init__(message or self.message)
-        self.message = message or self.message
+        # Only set instance attributes for actual overrides, otherwise fall through to class level defaults.
+        if message:
+            self.message = message
         # (Standardized) textual openEO error code
-        self.code = code or self.code
+        if code:
+            self.code = code
         # HTTP status code
-        self.status_code = status_code or self.status_code
+        if status_code:
+            self.status_code = status_code
         # Use request correlation id as error id to simplify post-mortem analysis.
-        self.id = id or FlaskRequestCorrelationIdLogging.get_request_id()
-        self.url = url or self.url
+        # Resolved lazily (see `id` property): most exceptions are never serialized.
+        self._id = id
+        if url:
+            self.url = url
+
+    @property
+    def id(self) -> str:
+        """
+        Error id: explicitly given `id` or, by default, the Flask request correlation id.
+
+        Note that the default is resolved lazily, on first access (e.g. through `to_dict()` or `repr()`),
+        not at construction time: it is the correlation id of the request context that first reads it
+        (or "no-request" outside of request context), which is then kept for subsequent access.
+        """
+        if not self._id:
+            self._id = FlaskRequestCorrelationIdLogging.get_request_id()
+        return self._id
+
+    @id.setter
+    def id(self, value: Optional[str]):
+        self._id = value
 
     def to_dict(self):
         """Generate OpenEO API compliant error dict to JSONify"""
-        d = {"message": str(self), "code": self.code, "id": self.id}
+        # Note: `self.message` is the same string as `str(self)`, without going through `BaseException.__str__`
         if self.url:
-            d['url'] = self.url
-        return d
+            return {"message": self.message, "code": self.code, "id": self.id, "url": self.url}
+        return {"message": self.message, "code": self.code, "id": self.id}
 
     def __repr__(self):
         return f"{type(self).__name__}(status_code={self.status_code!r}, code={self.code!r}, message={self.message!r}, id={self.id!r})"
 
 
+# Registry of `OpenEOApiException` subclasses by openEO error code (populated automatically on subclass creation).
+EXCEPTIONS_BY_CODE: Dict[str, Type[OpenEOApiException]] = {}
+
+
 # --- Begin of semi-autogenerated openEO exception classes ------------------------------------------------
 
 class TokenInvalidException(OpenEOApiException):
@@ -563,6 +600,12 @@ class BillingPlanMissingException(OpenEOApiException):
 # --- End of semi-autogenerated openEO exception classes ------------------------------------------------
 
 
+@functools.lru_cache(maxsize=1)
+def _load_error_spec() -> Mapping[str, dict]:
+    """Load (and cache) the openEO API error spec (as read-only mapping, as it is shared)."""
+    return types.MappingProxyType(read_spec("openeo-api/1.x/errors.json"))
+
+
 class OpenEOApiErrorSpecHelper:
     """
     Helper class around OpenEO API error handling spec to support automated
@@ -570,11 +613,26 @@ class OpenEOApiErrorSpecHelper:
     """
     _placeholder_regex = re.compile(r"{(\w+)}")
 
-    def __init__(self, spec: dict = None):
+    # Source code templates for `generate_exception_class` (dedented/indented once, at class creation).
+    _CLASS_TEMPLATE = textwrap.dedent("""\
+        class {code}Exception({parent}):
+            status_code = {status}
+            code = {code!r}
+            message = {message!r}
+            _description = {description!r}
+            _tags = {tags!r}
+        """)
+    _INIT_TEMPLATE = textwrap.indent(textwrap.dedent("""\
+        def __init__(self, {args}):
+            super().__init__(message=self.message.format({format_args}))
+        """), prefix=" " * 4)
+
+    def __init__(self, spec: Optional[Mapping[str, dict]] = None):
         if spec is None:
-            with (SPECS_ROOT / 'openeo-api/1.x/errors.json').open('r', encoding='utf-8') as f:
-                spec = json.load(f)
+            spec = _load_error_spec()
         self._spec = spec
+        # Cache of generated source code per error code
+        self._generated: Dict[str, str] = {}
 
     def get(self, error_code: str) -> dict:
         return self._spec[error_code]
@@ -584,49 +642,40 @@ class OpenEOApiErrorSpecHelper:
 
     def generate_exception_class(self, error_code: str) -> str:
         """Generate source code for given OpenEO error code"""
+        if error_code not in self._generated:
+            self._generated[error_code] = self._generate_exception_class(error_code)
+        return self._generated[error_code]
+
+    def _generate_exception_class(self, error_code: str) -> str:
         spec = self._spec[error_code]
         message = spec["message"]
-        src = textwrap.dedent("""\
-            class {code}Exception({parent}):
-                status_code = {status}
-                code = {code!r}
-                message = {message!r}
-                _description = {description!r}
-                _tags = {tags!r}
-            """.format(
+        src = self._CLASS_TEMPLATE.format(
             code=error_code, parent=OpenEOApiException.__name__,
             status=spec["http"],
             message=message,
             description=spec["description"],
             tags=sorted(spec["tags"]),
-        ))
+        )
         placeholders = self.extract_placeholders(message)
         if placeholders:
-            init = textwrap.dedent("""\
-                def __init__(self, {args}):
-                    super().__init__(message=self.message.format({format_args}))
-            """.format(
+            src += "\n" + self._INIT_TEMPLATE.format(
                 args=", ".join("{p}: str".format(p=p) for p in placeholders),
                 format_args=", ".join("{p}={p}".format(p=p) for p in placeholders)
-            ))
-            src += "\n" + textwrap.indent(init, prefix=" " * 4)
+            )
         return src
 
-    @classmethod
-    def extract_placeholders(cls, message) -> Set[str]:
-        return set(cls._placeholder_regex.findall(message))
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def extract_placeholders(message: str) -> FrozenSet[str]:
+        # Messages are (mostly) the fixed spec templates, so memoize the regex scan.
+        return frozenset(OpenEOApiErrorSpecHelper._placeholder_regex.findall(message))
 
 
 if __name__ == '__main__':
     # Print suggested exception class implementations for missing errors
     spec_helper = OpenEOApiErrorSpecHelper()
 
-    implemented_codes = [
-        v.code for v in globals().values()
-        if isinstance(v, type) and issubclass(v, OpenEOApiException) and v is not OpenEOApiException
-    ]
-    expected_codes = set(spec_helper.get_error_codes())
-    unimplemented = expected_codes.difference(implemented_codes)
+    unimplemented = set(spec_helper.get_error_codes()) - EXCEPTIONS_BY_CODE.keys()
     # Sort on tag
     unimplemented = sorted(unimplemented, key=lambda code: sorted(spec_helper.get(code)["tags"]))
 
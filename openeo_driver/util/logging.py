@@ -6,6 +6,7 @@ import os
 import sys
 import threading
 import time
+import types
 from pathlib import Path
 from typing import Dict, List, Optional, Union, Callable
 
@@ -47,6 +48,17 @@ LOG_HANDLER_ROTATING_FILE_JSON = "rotating_file_json"
 # Sentinel value for unset values
 _UNSET = object()
 
+# Default log levels per logger (to be merged with user specified ones)
+_DEFAULT_LOGGERS = types.MappingProxyType(
+    {
+        "gunicorn": {"level": "INFO"},
+        "werkzeug": {"level": "INFO"},
+        "kazoo": {"level": "WARN"},
+        "py4j": {"level": "WARN"},
+        "openeo.udf.debug": {"level": "DEBUG"},
+    }
+)
+
 
 def get_logging_config(
     *,
@@ -64,14 +76,8 @@ def get_logging_config(
     """Construct logging config dict to be loaded with `logging.config.dictConfig`"""
 
     # Merge log levels per logger with some defaults
-    default_loggers = {
-        "gunicorn": {"level": "INFO"},
-        "werkzeug": {"level": "INFO"},
-        "kazoo": {"level": "WARN"},
-        "py4j": {"level": "WARN"},
-        "openeo.udf.debug": {"level": "DEBUG"}
-    }
-    loggers = {**default_loggers, **(loggers or {})}
+    # (shallow copies of the default logger configs, so that the returned config can be modified safely)
+    loggers = {**{name: dict(c) for name, c in _DEFAULT_LOGGERS.items()}, **(loggers or {})}
 
     json_filters = [
         # Enabled filters by default.
@@ -322,7 +328,7 @@ class FlaskUserIdLogging(logging.Filter):
     @classmethod
     def get_user_id(cls) -> Union[str, None]:
         """Get user id as stored in Flask request global `g`."""
-        if flask.g:
+        if flask.has_app_context():
             return flask.g.get(cls.FLASK_G_ATTR, None)
 
     def filter(self, record: logging.LogRecord) -> bool:
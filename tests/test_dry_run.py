@@ -128,6 +128,19 @@ def test_data_trace():
     assert trace.get_operation_closest_to_source(["foobar", "filter_bbox"]) is t1
 
 
+def test_data_trace_collect_arguments():
+    source = DataSource.load_collection("S2")
+    trace = DataTrace(parent=source, operation="filter_bbox", arguments={"bbox": "Belgium"})
+    trace = DataTrace(parent=trace, operation="ndvi", arguments={"red": "B04"})
+    trace = DataTrace(parent=trace, operation="filter_bbox", arguments={"bbox": "Mol"})
+    assert trace.collect_arguments(["filter_bbox", "ndvi", "foobar"]) == {
+        "filter_bbox": [{"bbox": "Belgium"}, {"bbox": "Mol"}],
+        "ndvi": [{"red": "B04"}],
+        "foobar": [],
+    }
+    assert source.collect_arguments(["filter_bbox"]) == {"filter_bbox": []}
+
+
 def test_dry_run_data_tracer():
     tracer = DryRunDataTracer()
     source = DataSource.load_collection("S2")
@@ -153,6 +166,28 @@ def test_dry_run_data_tracer_process_traces():
     }
 
 
+def test_dry_run_data_tracer_trace_leaves_order():
+    tracer = DryRunDataTracer()
+    source = tracer.add_trace(DataSource.load_collection("S2"))
+    [a] = tracer.process_traces([source], operation="ndvi", arguments={})
+    [b] = tracer.process_traces([source], operation="evi", arguments={})
+    assert tracer.get_trace_leaves() == [a, b]
+    [c] = tracer.process_traces([a], operation="filter_bbox", arguments={"bbox": "mol"})
+    [d] = tracer.process_traces([a], operation="filter_bbox", arguments={"bbox": "geel"})
+    assert tracer.get_trace_leaves() == [c, d, b]
+
+
+def test_dry_run_data_tracer_trace_leaves_untracked_child():
+    tracer = DryRunDataTracer()
+    source = DataSource.load_collection("S2")
+    t1 = tracer.add_trace(DataTrace(parent=source, operation="ndvi", arguments={}))
+    assert tracer.get_trace_leaves() == [t1]
+    # Tree grows without going through the tracer
+    t2 = DataTrace(parent=t1, operation="bands", arguments=["B02"])
+    assert tracer.get_trace_leaves() == [t2]
+    assert tracer.get_source_constraints() == [(("load_collection", ("S2", ())), {"bands": ["B02"]})]
+
+
 def test_tracer_load_collection():
     tracer = DryRunDataTracer()
     arguments = {
@@ -183,6 +218,8 @@ def test_evaluate_basic_load_collection(dry_run_env, dry_run_tracer):
 
     source_constraints = dry_run_tracer.get_source_constraints(merge=True)
     assert source_constraints == [(("load_collection", ("S2_FOOBAR", ())), {})]
+    assert source_constraints[0].source_id == ("load_collection", ("S2_FOOBAR", ()))
+    assert source_constraints[0].constraints == {}
 
 
 def test_evaluate_basic_filter_temporal(dry_run_env, dry_run_tracer):
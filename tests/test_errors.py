@@ -1,3 +1,4 @@
+import functools
 from inspect import isclass
 from itertools import groupby
 from typing import Dict, Type, List
@@ -11,6 +12,7 @@ from openeo_driver.errors import OpenEOApiException, OpenEOApiErrorSpecHelper
 from openeo_driver.util.logging import FlaskRequestCorrelationIdLogging
 
 
+@functools.lru_cache(maxsize=None)
 def get_defined_exceptions(mod=openeo_driver.errors) -> Dict[str, List[Type[OpenEOApiException]]]:
     # Get defined errors
     defined_exceptions = [
@@ -30,6 +32,22 @@ def test_extract_placeholders():
     assert OpenEOApiErrorSpecHelper.extract_placeholders(message) == {"color", "verb", "animal"}
 
 
+def test_exceptions_by_code():
+    registry = openeo_driver.errors.EXCEPTIONS_BY_CODE
+    assert registry["CollectionNotFound"] is openeo_driver.errors.CollectionNotFoundException
+    assert registry["Internal"] is openeo_driver.errors.InternalException
+    for code, exceptions in get_defined_exceptions().items():
+        assert registry[code] in exceptions
+
+
+def test_exceptions_by_code_subclass_does_not_hijack_code():
+    class CustomCollectionNotFoundException(openeo_driver.errors.CollectionNotFoundException):
+        pass
+
+    registry = openeo_driver.errors.EXCEPTIONS_BY_CODE
+    assert registry["CollectionNotFound"] is openeo_driver.errors.CollectionNotFoundException
+
+
 def test_unknown_error_codes():
     from_spec = set(OpenEOApiErrorSpecHelper().get_error_codes())
     defined = set(get_defined_exceptions().keys())
@@ -112,3 +130,44 @@ def test_flask_request_id_as_api_error_id():
         "id": "1234-5678-91011",
         "message": "No hello for you!",
     }
+
+
+def test_api_error_id_explicit():
+    app = flask.Flask(__name__)
+    with mock.patch.object(FlaskRequestCorrelationIdLogging, "_build_request_id", return_value="1234-5678-91011"):
+        with app.test_request_context("/hello"):
+            FlaskRequestCorrelationIdLogging.before_request()
+            error = OpenEOApiException("No hello for you!", id="my-error-id")
+            assert error.id == "my-error-id"
+            assert error.to_dict()["id"] == "my-error-id"
+
+
+def test_api_error_id_setter():
+    error = OpenEOApiException("No hello for you!")
+    error.id = "my-error-id"
+    assert error.id == "my-error-id"
+    assert error.to_dict()["id"] == "my-error-id"
+
+
+def test_api_error_id_repeated_access():
+    app = flask.Flask(__name__)
+    with mock.patch.object(
+        FlaskRequestCorrelationIdLogging, "_build_request_id", side_effect=["1234-5678-91011", "2345-6789-10111"]
+    ):
+        with app.test_request_context("/hello"):
+            FlaskRequestCorrelationIdLogging.before_request()
+            error = OpenEOApiException("No hello for you!")
+            assert error.id == "1234-5678-91011"
+            # Changing request id afterwards does not affect the id of an already resolved error
+            FlaskRequestCorrelationIdLogging.before_request()
+            assert FlaskRequestCorrelationIdLogging.get_request_id() == "2345-6789-10111"
+            assert error.id == "1234-5678-91011"
+            assert error.to_dict()["id"] == "1234-5678-91011"
+    # Also outside of the request context
+    assert error.id == "1234-5678-91011"
+
+
+def test_api_error_id_no_request():
+    error = OpenEOApiException("No hello for you!")
+    assert error.id == "no-request"
+    assert error.id == "no-request"